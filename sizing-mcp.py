@@ -1,5 +1,7 @@
-import math
-from typing import List, Dict, Any
+from math import ceil
+from bisect import bisect_left
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, NamedTuple
 from fastmcp import FastMCP
 
 # Create the MCP server
@@ -51,6 +53,152 @@ search_instances = {
     }
 }
 
+# Bytes to gigabytes; 1024**3 is a power of two, so multiplying by its inverse is exact
+_INV_GB = 1.0 / (1024**3)
+
+# Instances as (ram, vCPU, storage, name) tuples ordered smallest first, with RAM keys for bisecting
+_INSTANCES_SORTED = sorted(
+    ((s['ram_gigs'], s['vCPU'], s['storage_gigs'], name) for name, s in search_instances.items()),
+    key=lambda t: (t[0], search_instances[t[3]]['price_hr'])
+)
+_RAM_KEYS = [t[0] for t in _INSTANCES_SORTED]
+
+# Largest capacities on offer; totals beyond any of these cannot fit a listed instance
+_MAX_RAM = max(s['ram_gigs'] for s in search_instances.values())
+_MAX_VCPU = max(s['vCPU'] for s in search_instances.values())
+_MAX_STORAGE = max(s['storage_gigs'] for s in search_instances.values())
+
+# Lexical field types as integer ids, resolved once per field in the walk
+_FIELD_TYPE_IDS = {'String': 0, 'Autocomplete': 1, 'Embedded': 2}
+
+# Quantization types as integer ids and their storage reduction factors, indexed by id; unknown
+# types get their own id, quantized with no size reduction
+_QUANTIZATION_IDS = {'none': 0, 'scalar': 1, 'binary': 2}
+_QUANTIZATION_UNKNOWN = 3
+_QUANTIZATION_FACTORS = (1.0, 3.75, 24, 1.0)
+
+# Autocomplete types as integer kinds, keeping the arithmetic kernel integer-only
+_AUTOCOMPLETE_KINDS = {'edgeGram': 0, 'nGram': 1}
+
+def _T(n: int) -> int:
+    # Triangular number: 1 + 2 + ... + n
+    return n * (n + 1) // 2
+
+def _S(n: int) -> int:
+    # Square pyramidal number: 1^2 + 2^2 + ... + n^2
+    return n * (n + 1) * (2 * n + 1) // 6
+
+@lru_cache(maxsize=128)
+def _autocomp_chars(kind: int, min_grams: int, max_grams: int, avg_chars: int) -> int:
+    # Sum over gram lengths k in [min_grams, max_grams] of k (edgeGram) or (avg_chars + 1 - k) * k (nGram)
+    gram_sum = _T(max_grams) - _T(min_grams - 1)
+    if kind == 0:
+        return gram_sum
+    return (max(max_grams, avg_chars) + 1) * gram_sum - _S(max_grams) + _S(min_grams - 1)
+
+def _get_total_autocomplete_chars(field: Dict[str, Any]) -> int:
+    kind = _AUTOCOMPLETE_KINDS.get(field.get('autocomplete_type'))
+    if kind is None:
+        raise ValueError("Unknown AutocompleteType")
+    return _autocomp_chars(kind, field.get('min_grams', 3), field.get('max_grams', 15), field.get('avg_chars', 30))
+
+def _walk_lexical(num_docs: int, fields: List[Dict[str, Any]]) -> Tuple[float, int]:
+    # Single depth-first pass returning (storage_bytes, added_embedded_docs). Embedded levels are
+    # pushed on an explicit stack instead of recursing; when a level finishes, its totals (for one
+    # set of its own num_documents) are scaled into the parent exactly as a recursive walk would.
+    stack = []
+    fields_iter, level_docs, storage, added, level_count = iter(fields), num_docs, 0.0, 0, 1
+    while True:
+        for field in fields_iter:
+            get = field.get
+            count, type_id = get('count', 1), _FIELD_TYPE_IDS.get(get('field_type'))
+            if type_id == 0:
+                storage += get('size', 0) * get('storage_multiplier', 3.33) * level_docs * count
+            elif type_id == 1:
+                storage += _get_total_autocomplete_chars(field) * level_docs * count
+            elif type_id == 2:
+                emb_sizing = field['embedded_sizing']
+                stack.append((fields_iter, level_docs, storage, added, level_count))
+                fields_iter, level_docs, storage, added, level_count = (
+                    iter(emb_sizing.get('fields', [])), emb_sizing.get('num_documents', 1000), 0.0, 0, count)
+                break
+        else:
+            if not stack:
+                return storage, added
+            emb_num_docs, emb_storage, emb_added, emb_count = level_docs, storage, added, level_count
+            fields_iter, level_docs, storage, added, level_count = stack.pop()
+            storage += emb_storage * level_docs * emb_count
+            added += (emb_num_docs + emb_added) * level_docs * emb_count
+
+def _vcpu(qps: float, latency: Any) -> int:
+    # latency is seconds, or an exact [numerator, denominator] pair of ints that avoids float rounding
+    if isinstance(latency, (list, tuple)):
+        if len(latency) != 2 or any(type(v) is not int for v in latency) or latency[1] <= 0:
+            raise ValueError("latency pair must be [numerator, denominator] integers with a positive denominator")
+        num, den = latency
+        return int(-(-(qps * num) // den))
+    return ceil(qps * latency)
+
+def _calculate_lexical_sizing(params: Dict[str, Any]) -> Dict[str, Any]:
+    num_docs, fields = params.get('num_documents', 1000), params.get('fields', [])
+    storage_bytes, embedded_docs = _walk_lexical(num_docs, fields)
+    ram_denom = params.get('index_size_to_ram_ratio_denominator', 8)
+    return {
+        'storage_bytes': storage_bytes,
+        'ram_bytes': storage_bytes / ram_denom,
+        'vcpu': _vcpu(params.get('qps', 20), params.get('latency', 0.05)),
+        'lexical_docs': num_docs + embedded_docs
+    }
+
+def _calculate_vector_sizing(params: Dict[str, Any]) -> Dict[str, Any]:
+    num_docs = params.get('num_documents', 1000)
+    total_dims = sum(f.get('dimensions', 1536) * f.get('count', 1) for f in params.get('fields', []) if f.get('field_type') == 'Vector')
+    base_storage = total_dims * 4 * num_docs
+
+    q_settings = params.get('quantization_settings', {})
+    q_id = _QUANTIZATION_IDS.get(q_settings.get('type', 'none'), _QUANTIZATION_UNKNOWN)
+
+    if q_id == 0:
+        ram_bytes = base_storage * 1.1
+        storage_bytes = base_storage
+    else:
+        quantized_storage = base_storage / _QUANTIZATION_FACTORS[q_id]
+        ram_bytes = 1.1 * quantized_storage
+        storage_bytes = (base_storage + quantized_storage) if q_settings.get('method') == 'database' else quantized_storage
+
+    return {
+        'storage_bytes': storage_bytes,
+        'ram_bytes': ram_bytes,
+        'vcpu': _vcpu(params.get('qps', 20), params.get('latency', 0.3))
+    }
+
+class SizingResult(NamedTuple):
+    """Unrounded totals for one request; the tool rounds and renames them for the MCP response."""
+    storage_gb: float
+    ram_gb: float
+    vcpu: int
+    lexical_docs: int
+    suggested_instance: str
+
+def _calculate_sizing(lexical_sizing: Dict[str, Any], vector_sizing: Dict[str, Any], reindex_space_multiplier: float) -> SizingResult:
+    lexical_results = _calculate_lexical_sizing(lexical_sizing)
+    vector_results = _calculate_vector_sizing(vector_sizing)
+    
+    # Accumulate in bytes and convert to GB once
+    total_storage = (lexical_results['storage_bytes'] + vector_results['storage_bytes']) * reindex_space_multiplier * _INV_GB
+    total_ram = (lexical_results['ram_bytes'] + vector_results['ram_bytes']) * _INV_GB
+    total_vcpu = lexical_results['vcpu'] + vector_results['vcpu']
+    
+    # --- Find Suggested Instance ---
+    suggested_instance = "Custom sizing required. No suitable instance found."
+    if total_ram <= _MAX_RAM and total_vcpu <= _MAX_VCPU and total_storage <= _MAX_STORAGE:
+        for ram, vcpu, storage, name in _INSTANCES_SORTED[bisect_left(_RAM_KEYS, total_ram):]:
+            if vcpu >= total_vcpu and storage >= total_storage:
+                suggested_instance = name
+                break  # Found the smallest suitable instance
+
+    return SizingResult(total_storage, total_ram, total_vcpu, lexical_results['lexical_docs'], suggested_instance)
+
 @mcp.tool
 def calculate_sizing_requirements(
     lexical_sizing: Dict[str, Any],
@@ -99,105 +247,23 @@ def calculate_sizing_requirements(
                 }
             }
 
+        Both configurations accept "latency" in seconds, or as an exact [numerator, denominator]
+        pair of integers (e.g. [5, 100] for 0.05) to size vCPU without float rounding.
+
         reindex_space_multiplier (float, optional): A multiplier for storage to account for reindexing. Defaults to 2.25.
 
     Returns:
         A dictionary with the final calculated results: StorageGb, RAMGb, vCPU, LexicalDocs, and suggested_instance.
     """
 
-    # --- Internal Helper Functions (encapsulated within the tool) ---
-    def _get_total_autocomplete_chars(field: Dict[str, Any]) -> int:
-        min_grams, max_grams = field.get('min_grams', 3), field.get('max_grams', 15)
-        if field.get('autocomplete_type') == 'edgeGram':
-            return ((max_grams - min_grams + 1) * (max_grams + min_grams) // 2)
-        elif field.get('autocomplete_type') == 'nGram':
-            avg_chars = max(max_grams, field.get('avg_chars', 30))
-            term1 = (avg_chars + 1) * (max_grams - min_grams + 1) * (max_grams + min_grams) // 2
-            term2 = (max_grams * (max_grams + 1) * (2 * max_grams + 1)) // 6
-            term3 = (min_grams * (min_grams + 1) * (2 * min_grams + 1)) // 6
-            return term1 - term2 + term3 - (min_grams**2)
-        raise ValueError("Unknown AutocompleteType")
-
-    def _calculate_basic_storage(num_docs: int, fields: List[Dict[str, Any]]) -> float:
-        storage = 0.0
-        for field in fields:
-            count, f_type = field.get('count', 1), field.get('field_type')
-            if f_type == 'String':
-                storage += field.get('size', 0) * field.get('storage_multiplier', 3.33) * num_docs * count
-            elif f_type == 'Autocomplete':
-                storage += _get_total_autocomplete_chars(field) * num_docs * count
-            elif f_type == 'Embedded':
-                emb_sizing = field['embedded_sizing']
-                emb_storage = _calculate_basic_storage(emb_sizing.get('num_documents', 1000), emb_sizing.get('fields', []))
-                storage += emb_storage * num_docs * count
-        return storage
-
-    def _calculate_embedded_docs(num_docs: int, fields: List[Dict[str, Any]]) -> int:
-        added = 0
-        for field in fields:
-            if field.get('field_type') == 'Embedded':
-                emb_sizing, count = field['embedded_sizing'], field.get('count', 1)
-                direct = emb_sizing.get('num_documents', 1000) * num_docs
-                recursive = _calculate_embedded_docs(direct, emb_sizing.get('fields', []))
-                added += (direct + recursive) * count
-        return added
-
-    def _calculate_lexical_sizing(params: Dict[str, Any]) -> Dict[str, Any]:
-        num_docs, fields = params.get('num_documents', 1000), params.get('fields', [])
-        storage_bytes = _calculate_basic_storage(num_docs, fields)
-        ram_denom = params.get('index_size_to_ram_ratio_denominator', 8)
-        return {
-            'storage_gb': storage_bytes / (1024**3),
-            'ram_gb': (storage_bytes / ram_denom) / (1024**3),
-            'vcpu': math.ceil(params.get('qps', 20) * params.get('latency', 0.05)),
-            'lexical_docs': num_docs + _calculate_embedded_docs(num_docs, fields)
-        }
-
-    def _calculate_vector_sizing(params: Dict[str, Any]) -> Dict[str, Any]:
-        num_docs = params.get('num_documents', 1000)
-        base_storage = sum(f.get('dimensions', 1536) * 4 * f.get('count', 1) for f in params.get('fields', []) if f.get('field_type') == 'Vector') * num_docs
-        
-        q_settings = params.get('quantization_settings', {})
-        q_type = q_settings.get('type', 'none')
-        q_factor = {'scalar': 3.75, 'binary': 24}.get(q_type, 1.0)
-        
-        if q_type != 'none':
-            quantized_storage = base_storage / q_factor
-            ram_bytes = 1.1 * quantized_storage
-            storage_bytes = (base_storage + quantized_storage) if q_settings.get('method') == 'database' else quantized_storage
-        else:
-            ram_bytes = base_storage * 1.1
-            storage_bytes = base_storage
-            
-        return {
-            'storage_gb': storage_bytes / (1024**3),
-            'ram_gb': ram_bytes / (1024**3),
-            'vcpu': math.ceil(params.get('qps', 20) * params.get('latency', 0.3))
-        }
-
-    # --- Main Execution ---
-    lexical_results = _calculate_lexical_sizing(lexical_sizing)
-    vector_results = _calculate_vector_sizing(vector_sizing)
-    
-    total_storage = (lexical_results['storage_gb'] + vector_results['storage_gb']) * reindex_space_multiplier
-    total_ram = lexical_results['ram_gb'] + vector_results['ram_gb']
-    total_vcpu = lexical_results['vcpu'] + vector_results['vcpu']
-    
-    # --- Find Suggested Instance ---
-    suggested_instance = "Custom sizing required. No suitable instance found."
-    for name, specs in search_instances.items():
-        if (specs['ram_gigs'] >= total_ram and
-            specs['vCPU'] >= total_vcpu and
-            specs['storage_gigs'] >= total_storage):
-            suggested_instance = name
-            break  # Found the smallest suitable instance
+    result = _calculate_sizing(lexical_sizing, vector_sizing, reindex_space_multiplier)
 
     return {
-        'StorageGb': round(total_storage, 3),
-        'RAMGb': round(total_ram, 3),
-        'vCPU': total_vcpu,
-        'LexicalDocs': lexical_results['lexical_docs'],
-        'suggested_instance': suggested_instance
+        'StorageGb': round(result.storage_gb, 3),
+        'RAMGb': round(result.ram_gb, 3),
+        'vCPU': result.vcpu,
+        'LexicalDocs': result.lexical_docs,
+        'suggested_instance': result.suggested_instance
     }
 
 if __name__ == "__main__":
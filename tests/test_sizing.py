@@ -0,0 +1,104 @@
+import importlib.util
+import os
+import unittest
+
+# The server lives in a hyphenated script, so load it by path
+_spec = importlib.util.spec_from_file_location(
+    "sizing_mcp", os.path.join(os.path.dirname(__file__), "..", "sizing-mcp.py")
+)
+sizing_mcp = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(sizing_mcp)
+calculate = sizing_mcp.calculate_sizing_requirements
+
+
+def _suggest(ram_gb, vcpu, storage_gb):
+    # Lexical-only load: index bytes are 8x the RAM (the default ratio), qps * latency sets the vCPU,
+    # and the reindex multiplier scales the index up to the requested storage
+    lexical = {
+        "num_documents": ram_gb * 8 * 1024**3,
+        "qps": vcpu,
+        "latency": 1,
+        "fields": [{"field_type": "String", "size": 1, "storage_multiplier": 1}],
+    }
+    return calculate(lexical, {"qps": 0}, storage_gb / (ram_gb * 8))["suggested_instance"]
+
+
+def _embedded_chain(depth):
+    fields = [{"field_type": "String", "size": 10}]
+    for _ in range(depth):
+        fields = [{"field_type": "Embedded", "embedded_sizing": {"num_documents": 1, "fields": fields}}]
+    return fields
+
+
+class InstanceSelectionTest(unittest.TestCase):
+    def test_exact_ram_boundary_fits(self):
+        self.assertEqual(_suggest(16, 8, 128), "S40")
+
+    def test_ram_just_over_boundary_moves_up(self):
+        self.assertEqual(_suggest(16.5, 8, 128), "S50")
+
+    def test_vcpu_limited_scans_past_bisect_point(self):
+        self.assertEqual(_suggest(4, 10, 32), "S50")
+
+    def test_storage_limited_scans_past_bisect_point(self):
+        self.assertEqual(_suggest(4, 1, 600), "S50")
+
+    def test_totals_beyond_largest_instance_need_custom_sizing(self):
+        custom = "Custom sizing required. No suitable instance found."
+        self.assertEqual(_suggest(129, 1, 1032), custom)  # RAM
+        self.assertEqual(_suggest(4, 65, 32), custom)  # vCPU
+        self.assertEqual(_suggest(4, 1, 2600), custom)  # storage
+        self.assertEqual(_suggest(128, 64, 2576), "S80")
+
+
+class DeepEmbeddedTest(unittest.TestCase):
+    def test_embedding_depth_beyond_recursion_limit(self):
+        depth = 1500
+        result = calculate({"num_documents": 10, "fields": _embedded_chain(depth)}, {})
+        self.assertEqual(result["LexicalDocs"], 10 + 10 * depth)
+
+
+class AutocompleteCharsTest(unittest.TestCase):
+    def test_closed_form_matches_original_formula(self):
+        def original(kind, min_grams, max_grams, avg_chars):
+            if kind == 0:
+                return (max_grams - min_grams + 1) * (max_grams + min_grams) // 2
+            avg_chars = max(max_grams, avg_chars)
+            term1 = (avg_chars + 1) * (max_grams - min_grams + 1) * (max_grams + min_grams) // 2
+            term2 = (max_grams * (max_grams + 1) * (2 * max_grams + 1)) // 6
+            term3 = (min_grams * (min_grams + 1) * (2 * min_grams + 1)) // 6
+            return term1 - term2 + term3 - (min_grams**2)
+
+        for kind in (0, 1):
+            for min_grams in range(1, 33):
+                for max_grams in range(1, 33):
+                    for avg_chars in (1, 15, 30, 64):
+                        self.assertEqual(
+                            sizing_mcp._autocomp_chars(kind, min_grams, max_grams, avg_chars),
+                            original(kind, min_grams, max_grams, avg_chars),
+                            (kind, min_grams, max_grams, avg_chars),
+                        )
+
+
+class RationalLatencyTest(unittest.TestCase):
+    def _vcpu(self, qps, latency):
+        return calculate({"qps": qps, "latency": latency}, {"qps": 0})["vCPU"]
+
+    def test_exact_pair_avoids_float_rounding(self):
+        self.assertEqual(self._vcpu(100, 0.07), 8)
+        self.assertEqual(self._vcpu(100, [7, 100]), 7)
+        self.assertEqual(self._vcpu(100, (7, 100)), 7)
+
+    def test_pair_rounds_up_non_integer_products(self):
+        self.assertEqual(self._vcpu(10.5, [1, 10]), 2)
+        self.assertEqual(self._vcpu(0.5, [1, 1]), 1)
+        self.assertEqual(self._vcpu(3, [1, 2]), 2)
+
+    def test_invalid_pairs_raise(self):
+        for latency in ([1, 2, 3], [1, 0], (1, 0), [1, -2], ["1", 2], [0.07, 1], [1, 2.0], [True, 1]):
+            with self.assertRaises(ValueError):
+                self._vcpu(10, latency)
+
+
+if __name__ == "__main__":
+    unittest.main()